@@ -2,6 +2,10 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import r2_score
+import matplotlib
+
+# Headless backend: this audit only writes PNGs, no window needed.
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import os
 
@@ -11,7 +15,11 @@ DATA_FILE = "data/raw/traffic_log.csv"
 
 def verify_integrity():
     print("🕵️  AUDITING AI LOGIC...")
-    df = pd.read_csv(DATA_FILE)
+    # Typed read: no inference scan, and float32/int32 columns halve RAM.
+    df = pd.read_csv(
+        DATA_FILE,
+        dtype={"step": "int32", "vehicle_count": "int32", "avg_speed": "float32"},
+    )
 
     # Feature Engineering
     HORIZON = 300
@@ -20,15 +28,18 @@ def verify_integrity():
     df["lag_5min"] = df["vehicle_count"].shift(300)
     df_clean = df.dropna()
 
-    X = df_clean[["step", "vehicle_count", "avg_speed", "lag_1min", "lag_5min"]]
-    y = df_clean["target"]
+    # Convert to contiguous float32 arrays ONCE — otherwise sklearn's
+    # check_array re-copies the DataFrame on every fit/predict call.
+    FEATURES = ["step", "vehicle_count", "avg_speed", "lag_1min", "lag_5min"]
+    X = df_clean[FEATURES].to_numpy(dtype=np.float32)
+    y = df_clean["target"].to_numpy(dtype=np.float32)
 
     # --- TEST 1: The "Hard" Split (No Shuffling) ---
     # We hide the last 20% of the simulation from the AI completely.
     # It has to guess the end of the day having only seen the morning/afternoon.
     cutoff = int(len(X) * 0.8)
-    X_train, X_test = X.iloc[:cutoff], X.iloc[cutoff:]
-    y_train, y_test = y.iloc[:cutoff], y.iloc[cutoff:]
+    X_train, X_test = X[:cutoff], X[cutoff:]
+    y_train, y_test = y[:cutoff], y[cutoff:]
 
     model = RandomForestRegressor(n_estimators=100, random_state=42)
     model.fit(X_train, y_train)
@@ -44,26 +55,28 @@ def verify_integrity():
     # What is the AI actually looking at?
     print(f"\n🧠 TEST 2: How the AI thinks (Feature Importance)")
     importances = model.feature_importances_
-    features = X.columns
+    features = FEATURES
 
-    sorted_idx = np.argsort(importances)
-    plt.figure(figsize=(10, 6))
-    plt.title("What drives the prediction?")
-    plt.barh(range(len(sorted_idx)), importances[sorted_idx], align="center")
-    plt.yticks(range(len(sorted_idx)), [features[i] for i in sorted_idx])
-    plt.xlabel("Importance")
-    plt.tight_layout()
-    plt.savefig("data/processed/ai_audit.png")
+    order = importances.argsort()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.set_title("What drives the prediction?")
+    # barh takes the labels directly — no manual ytick bookkeeping.
+    ax.barh(np.array(features)[order], importances[order], align="center")
+    ax.set_xlabel("Importance")
+    fig.tight_layout()
+    fig.savefig("data/processed/ai_audit.png")
+    plt.close(fig)  # free the canvas buffer
     print("   📊 Chart saved to data/processed/ai_audit.png")
 
     # --- TEST 3: Visual Proof ---
     # Plot Real vs Predicted for the test period
-    plt.figure(figsize=(12, 6))
-    plt.plot(y_test.values, label="Reality", color="blue", alpha=0.6)
-    plt.plot(pred, label="AI Prediction", color="red", linestyle="--")
-    plt.title(f"Reality vs Prediction (Last 20% of Simulation) | R2: {score:.2f}")
-    plt.legend()
-    plt.savefig("data/processed/prediction_audit.png")
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.plot(y_test, label="Reality", color="blue", alpha=0.6)
+    ax.plot(pred, label="AI Prediction", color="red", linestyle="--")
+    ax.set_title(f"Reality vs Prediction (Last 20% of Simulation) | R2: {score:.2f}")
+    ax.legend()
+    fig.savefig("data/processed/prediction_audit.png")
+    plt.close(fig)
     print("   📉 Graph saved to data/processed/prediction_audit.png")
 
 
@@ -1,11 +1,23 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
+from joblib import Parallel, delayed
 import os
 import sys
 
+# Numba is optional: if present, the feature kernel below is compiled to
+# machine code. Without it, the same loop runs as plain Python (slower,
+# identical results).
+try:
+    from numba import njit
+except ImportError:
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
 """
 Addis Ababa Traffic AI (Multi-Day Training V3)
 ----------------------------------------------
@@ -23,6 +35,40 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
 DATA_FILE = os.path.join(PROJECT_ROOT, "data", "raw", "synthetic_traffic_30days.csv")
 MODEL_FILE = os.path.join(PROJECT_ROOT, "data", "models", "traffic_model.pkl")
 
+# Worker count for parallel sections. Defaults to all cores; set
+# TRAFFIC_AI_N_JOBS=4 (etc.) on shared hosts to avoid oversubscription.
+N_JOBS = int(os.environ.get("TRAFFIC_AI_N_JOBS", "-1"))
+
+
+@njit(cache=True)
+def build_features(step, day, vc, spd, horizon, lag1, lag5):
+    """
+    Builds the lag/target feature matrix in ONE fused pass.
+
+    Expects arrays pre-sorted by (day, step). A row is valid only when
+    its lags and its target all fall inside the same day, so data never
+    leaks across day boundaries.
+
+    Returns (X, y, valid) — mask X and y with `valid` before training.
+    """
+    n = vc.size
+    X = np.empty((n, 5), dtype=np.float64)
+    y = np.empty(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=np.bool_)
+
+    for i in range(n):
+        if i >= lag5 and i + horizon < n:
+            if day[i] == day[i - lag5] and day[i] == day[i + horizon]:
+                X[i, 0] = step[i]
+                X[i, 1] = vc[i]
+                X[i, 2] = spd[i]
+                X[i, 3] = vc[i - lag1]
+                X[i, 4] = vc[i - lag5]
+                y[i] = vc[i + horizon]
+                valid[i] = True
+
+    return X, y, valid
+
 
 def train_brain():
     print("🧠 Initializing AI Training Protocol (Multi-Day Mode)...")
@@ -32,30 +78,51 @@ def train_brain():
         print("   Run 'src/utils/generate_synthetic_data.py' first!")
         sys.exit(1)
 
-    df = pd.read_csv(DATA_FILE)
+    # Explicit dtypes skip pandas' full-file type inference scan and keep
+    # the loaded frame at half the default float64/int64 footprint.
+    df = pd.read_csv(
+        DATA_FILE,
+        dtype={
+            "day": "int16",
+            "step": "int32",
+            "vehicle_count": "int32",
+            "avg_speed": "float32",
+        },
+    )
     print(f"📊 Loaded {len(df)} data points ({df['day'].nunique()} Days).")
 
     # --- FEATURE ENGINEERING ---
     HORIZON = 300
 
-    # Group by 'day' prevents shifting data from Day 1 into Day 2
-    # This keeps the math clean.
-    df["target"] = df.groupby("day")["vehicle_count"].shift(-HORIZON)
-    df["lag_1min"] = df.groupby("day")["vehicle_count"].shift(60)
-    df["lag_5min"] = df.groupby("day")["vehicle_count"].shift(300)
-
-    df_clean = df.dropna()
-
-    X = df_clean[["step", "vehicle_count", "avg_speed", "lag_1min", "lag_5min"]]
-    y = df_clean["target"]
+    # Sort once so each day is a contiguous block, then build the target
+    # and both lag columns in a single JIT-compiled pass over the arrays.
+    # No day ever bleeds into the next — the kernel checks boundaries.
+    df = df.sort_values(["day", "step"], ignore_index=True)
+
+    day = df["day"].to_numpy(np.int64)
+    X_all, y_all, valid = build_features(
+        df["step"].to_numpy(np.float64),
+        day,
+        df["vehicle_count"].to_numpy(np.float64),
+        df["avg_speed"].to_numpy(np.float64),
+        HORIZON,
+        60,
+        300,
+    )
+
+    # float32 halves the memory bandwidth of the row scans inside fit;
+    # vehicle counts fit comfortably within float32 precision.
+    X = X_all[valid].astype(np.float32)
+    y = y_all[valid].astype(np.float32)
+    day_valid = day[valid]
 
     # --- CHRONOLOGICAL SPLIT (The "Pro" Way) ---
     # We train on Days 1-25. We test on Days 26-30.
     # The AI has never seen the Test days before.
     split_day = 25
 
-    train_mask = df_clean["day"] <= split_day
-    test_mask = df_clean["day"] > split_day
+    train_mask = day_valid <= split_day
+    test_mask = day_valid > split_day
 
     X_train = X[train_mask]
     y_train = y[train_mask]
@@ -65,13 +132,29 @@ def train_brain():
     print(f"📉 Training Set: {len(X_train)} points (Days 1-{split_day})")
     print(f"📉 Testing Set:  {len(X_test)} points (Days {split_day + 1}-30)")
 
-    print("🏋️  Training Random Forest...")
-    # NOTE: shuffle=False is implied because we manually split the data
-    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+    print("🏋️  Training Gradient Boosted Trees (Histogram Mode)...")
+    # NOTE: shuffle=False is implied because we manually split the data.
+    # HGBT bins the features into uint8 histograms once and trains on the
+    # binned view — far faster than a forest on big tabular data, with a
+    # model that is a fraction of the size on disk.
+    model = HistGradientBoostingRegressor(
+        max_iter=200,
+        max_bins=255,
+        early_stopping=True,
+        random_state=42,
+    )
     model.fit(X_train, y_train)
 
     # --- EVALUATION ---
-    predictions = model.predict(X_test)
+    # Tree-ensemble prediction is embarrassingly parallel across rows:
+    # split the test set into one chunk per core and predict concurrently.
+    # Threads (not processes) so the model is never pickled per worker.
+    chunks = np.array_split(X_test, os.cpu_count() or 1)
+    predictions = np.concatenate(
+        Parallel(n_jobs=N_JOBS, prefer="threads")(
+            delayed(model.predict)(chunk) for chunk in chunks
+        )
+    )
     r2 = r2_score(y_test, predictions)
     mse = mean_squared_error(y_test, predictions)
 
@@ -81,7 +164,9 @@ def train_brain():
     print(f"   Mean Squared Error: {mse:.2f}")
     print("-" * 35)
 
-    joblib.dump(model, MODEL_FILE)
+    # Uncompressed + protocol 5 keeps the big ndarrays mmap-friendly:
+    # the app can load with mmap_mode='r' and share pages across workers.
+    joblib.dump(model, MODEL_FILE, protocol=5, compress=0)
     print(f"💾 Robust Model saved to: {MODEL_FILE}")
 
 
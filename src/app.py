@@ -1,5 +1,5 @@
 import gradio as gr
-import pandas as pd
+import numpy as np
 import joblib
 import os
 
@@ -14,22 +14,34 @@ MODEL_PATH = os.path.join(
     os.path.dirname(PROJECT_ROOT), "data", "models", "traffic_model.pkl"
 )
 
+# Load the model ONCE at startup and keep it warm. Deserializing the
+# tree ensemble per click would dwarf the actual prediction time.
+# mmap_mode='r' maps the node arrays straight from disk, so multiple
+# workers share the same pages instead of each holding a heap copy.
+MODEL = (
+    joblib.load(MODEL_PATH, mmap_mode="r") if os.path.exists(MODEL_PATH) else None
+)
+
+# Reusable single-row input buffer. Building a fresh DataFrame per click
+# costs more than the tree traversals themselves for one row.
+# Column order: step, vehicle_count, avg_speed, lag_1min, lag_5min.
+_INPUT_BUF = np.empty((1, 5), dtype=np.float32)
+
 
 def predict_congestion(step_time, current_count, current_speed, lag1, lag5):
     """AI Inference Engine."""
-    if not os.path.exists(MODEL_PATH):
+    if MODEL is None:
         return "⚠️ Error: Model not found. Train AI first!", "Error"
 
     try:
-        model = joblib.load(MODEL_PATH)
-
-        # Input DataFrame must match training features exactly
-        input_data = pd.DataFrame(
-            [[step_time, current_count, current_speed, lag1, lag5]],
-            columns=["step", "vehicle_count", "avg_speed", "lag_1min", "lag_5min"],
-        )
-
-        pred_float = model.predict(input_data)[0]
+        # Order must match training features exactly
+        _INPUT_BUF[0, 0] = step_time
+        _INPUT_BUF[0, 1] = current_count
+        _INPUT_BUF[0, 2] = current_speed
+        _INPUT_BUF[0, 3] = lag1
+        _INPUT_BUF[0, 4] = lag5
+
+        pred_float = MODEL.predict(_INPUT_BUF)[0]
         prediction = int(pred_float)
 
         status = "🟢 Free Flow"
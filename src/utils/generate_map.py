@@ -2,6 +2,7 @@ import os
 import subprocess
 import requests
 import sys
+from email.utils import formatdate
 
 """
 Addis Ababa Traffic Map Generator (V2.1 - Automated)
@@ -29,15 +30,34 @@ NET_FILE = os.path.join(SIM_DIR, "osm.net.xml")
 POLY_FILE = os.path.join(SIM_DIR, "osm.poly.xml")
 
 
+def _stale(src, dst):
+    """True if dst is missing or older than src (i.e. needs rebuilding)."""
+    return not os.path.exists(dst) or os.path.getmtime(src) > os.path.getmtime(dst)
+
+
 def download_osm_data():
     """Fetches raw geographic data from OpenStreetMap API."""
     print(f"🌍 Connecting to OpenStreetMap API...")
     url = f"https://api.openstreetmap.org/api/0.6/map?bbox={BBOX}"
+
+    # Ask the server to skip the payload if our copy is still current.
+    headers = {}
+    if os.path.exists(OSM_FILE):
+        headers["If-Modified-Since"] = formatdate(
+            os.path.getmtime(OSM_FILE), usegmt=True
+        )
+
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        with open(OSM_FILE, "wb") as f:
-            f.write(response.content)
+        # Stream the payload straight to disk in 64 KB chunks — the OSM
+        # extract can run to tens of MB and never needs to sit in RAM.
+        with requests.get(url, stream=True, timeout=30, headers=headers) as response:
+            if response.status_code == 304:
+                print("✅ Map Data unchanged on server. Reusing cached copy.")
+                return
+            response.raise_for_status()
+            with open(OSM_FILE, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
         print("✅ Map Data Downloaded.")
     except Exception as e:
         print(f"❌ Network Error: {e}")
@@ -85,8 +105,16 @@ def build_network():
         typemap,
     ]
 
-    subprocess.run(cmd_net, check=True, stdout=subprocess.DEVNULL)
-    subprocess.run(cmd_poly, check=False, stdout=subprocess.DEVNULL)
+    # Only rebuild what is older than the raw OSM data — warm runs skip
+    # the expensive netconvert/polyconvert passes entirely.
+    if _stale(OSM_FILE, NET_FILE):
+        subprocess.run(cmd_net, check=True, stdout=subprocess.DEVNULL)
+    else:
+        print("   ↪ Network up to date, skipping netconvert.")
+    if _stale(OSM_FILE, POLY_FILE):
+        subprocess.run(cmd_poly, check=False, stdout=subprocess.DEVNULL)
+    else:
+        print("   ↪ Scenery up to date, skipping polyconvert.")
     print("✅ Network & Scenery Built.")
 
 
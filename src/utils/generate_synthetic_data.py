@@ -2,16 +2,28 @@ import pandas as pd
 import numpy as np
 import os
 
+# Numba is optional (same pattern as the trainer): with it, the
+# bell-curve kernel compiles to threaded machine code; without it, the
+# loop runs as plain Python with identical output.
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
 """
 Synthetic Data Generator (Multi-Day Augmentation)
 -------------------------------------------------
-This script mathematically generates 30 days of traffic data based on the 
+This script mathematically generates 30 days of traffic data based on the
 Bell-Curve pattern we validated in the simulation.
 
-Why? 
-To train the AI properly (without shuffling), we need distinct days 
-(e.g., Train on Days 1-25, Test on Days 26-30). Running the actual simulation 
-30 times would take hours. This script mimics the simulation physics 
+Why?
+To train the AI properly (without shuffling), we need distinct days
+(e.g., Train on Days 1-25, Test on Days 26-30). Running the actual simulation
+30 times would take hours. This script mimics the simulation physics
 to generate the data instantly.
 """
 
@@ -20,51 +32,86 @@ DAYS_TO_SIMULATE = 30
 STEPS_PER_DAY = 3600
 OUTPUT_FILE = os.path.join("data", "raw", "synthetic_traffic_30days.csv")
 
-
-def generate_day(day_id):
+# One Generator for the whole module: the modern API is faster than the
+# legacy global np.random state, and a fixed seed makes the dataset
+# reproducible (same spirit as random_state=42 on the training side).
+rng = np.random.default_rng(42)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _fill_days(counts, speeds, peak_time, width, max_cars, noise_c, noise_s):
+    """
+    Fused bell-curve + speed kernel, one pass per day row.
+
+    Gaussian, noise, clipping and the count→speed law are computed in a
+    single fused loop into the pre-allocated output grids, with the day
+    axis parallelized across cores. Noise is drawn OUTSIDE (NumPy and
+    Numba random streams differ).
+    """
+    days, steps = counts.shape
+    for d in prange(days):
+        inv = -0.5 / (width[d] * width[d])
+        for t in range(steps):
+            # The Math: Gaussian Function (+ sensor jitter)
+            c = max_cars[d] * np.exp((t - peak_time[d]) ** 2 * inv) + noise_c[d, t]
+
+            # Physics Constraint: Cars cannot be negative
+            if c < 0.0:
+                c = 0.0
+            c = int(c)
+            counts[d, t] = c
+
+            # Standard Traffic Flow Theory: More Cars = Lower Speed.
+            # Free flow = 15 m/s. Jam = 2 m/s. (+ driver variation)
+            s = 15.0 - c / max_cars[d] * 13.0 + noise_s[d, t]
+            if s < 1.0:  # Speed limits
+                s = 1.0
+            elif s > 20.0:
+                s = 20.0
+            speeds[d, t] = round(s, 2)
+
+
+def generate_traffic_data(days=DAYS_TO_SIMULATE):
+    """
+    Builds ALL days at once on a (days, steps) grid.
+
+    Per-day bell-curve parameters and the noise are drawn up front; the
+    jitted kernel then fills both output grids in one fused pass and a
+    single DataFrame is built at the end (no per-day concat).
+    """
     # Time steps (0 to 3599)
     steps = np.arange(STEPS_PER_DAY)
 
     # --- 1. The Physics Pattern (Bell Curve) ---
     # We validated in 'fix/data-bias-logic' that traffic peaks ~1800s.
-    # We add random variation so every day looks slightly different.
+    # One parameter per day so every day looks slightly different.
 
     # Peak Time: 1800s +/- 5 minutes
-    peak_time = 1800 + np.random.randint(-300, 300)
+    peak_time = 1800 + rng.integers(-300, 300, size=days)
 
     # Peak Duration (Width): Varies slightly
-    width = 600 + np.random.randint(-50, 50)
+    width = 600 + rng.integers(-50, 50, size=days)
 
     # Peak Height (Max Cars): 150 to 200 cars (Matches our Sim)
-    max_cars = 180 + np.random.randint(-30, 30)
-
-    # The Math: Gaussian Function
-    counts = max_cars * np.exp(-((steps - peak_time) ** 2) / (2 * width**2))
+    max_cars = 180 + rng.integers(-30, 30, size=days)
 
     # --- 2. Add Realism (Noise) ---
-    # Real sensors are noisy. We add +/- 5 cars jitter.
-    noise = np.random.normal(0, 5, STEPS_PER_DAY)
-    counts = counts + noise
+    # Real sensors are noisy (+/- 5 cars), and drivers vary (+/- 1 m/s).
+    noise_c = rng.normal(0, 5, size=(days, STEPS_PER_DAY))
+    noise_s = rng.normal(0, 1, size=(days, STEPS_PER_DAY))
 
-    # Physics Constraint: Cars cannot be negative
-    counts = np.maximum(counts, 0).astype(int)
+    # --- 3. Run the fused kernel into pre-allocated grids ---
+    counts = np.empty((days, STEPS_PER_DAY), dtype=np.int32)
+    speeds = np.empty((days, STEPS_PER_DAY), dtype=np.float32)
+    _fill_days(counts, speeds, peak_time, width, max_cars, noise_c, noise_s)
 
-    # --- 3. Calculate Speed ---
-    # Standard Traffic Flow Theory: More Cars = Lower Speed.
-    # Free flow = 15 m/s. Jam = 2 m/s.
-    speeds = 15 - (counts / max_cars * 13)
-
-    # Add random speed variations (some drivers are slow/fast)
-    speeds = speeds + np.random.normal(0, 1, STEPS_PER_DAY)
-    speeds = np.clip(speeds, 1, 20)  # Speed limits
-
-    # Build the Table
+    # Build the Table: ravel the grids into long-format columns
     df = pd.DataFrame(
         {
-            "day": day_id,
-            "step": steps,
-            "vehicle_count": counts,
-            "avg_speed": np.round(speeds, 2),
+            "day": np.repeat(np.arange(1, days + 1), STEPS_PER_DAY),
+            "step": np.tile(steps, days),
+            "vehicle_count": counts.ravel(),
+            "avg_speed": speeds.ravel(),
         }
     )
 
@@ -74,19 +121,21 @@ def generate_day(day_id):
 if __name__ == "__main__":
     print(f"🎲 Generating {DAYS_TO_SIMULATE} days of synthetic traffic data...")
 
-    # Generate all days
-    all_days = []
-    for i in range(1, DAYS_TO_SIMULATE + 1):
-        all_days.append(generate_day(i))
-
-    # Combine into one huge dataset
-    final_df = pd.concat(all_days)
+    final_df = generate_traffic_data()
 
     # Ensure directory exists
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
 
-    # Save
-    final_df.to_csv(OUTPUT_FILE, index=False)
+    # Save. pyarrow's C++ CSV writer skips pandas' per-cell Python
+    # formatting loop (several times faster on the 108k-row file);
+    # plain to_csv remains the fallback where pyarrow isn't installed.
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        pacsv.write_csv(pa.Table.from_pandas(final_df), OUTPUT_FILE)
+    except ImportError:
+        final_df.to_csv(OUTPUT_FILE, index=False)
 
     print(f"✅ Generated {len(final_df)} data points.")
     print(f"💾 Saved to: {OUTPUT_FILE}")
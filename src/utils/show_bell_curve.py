@@ -1,4 +1,11 @@
+import os
 import numpy as np
+import matplotlib
+
+# Headless runs (CI, servers) have no window to open: use Agg there.
+INTERACTIVE = bool(os.environ.get("DISPLAY")) and not os.environ.get("CI")
+if not INTERACTIVE:
+    matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
 
@@ -38,7 +45,9 @@ def plot_theoretical_curve():
     # Save
     plt.savefig("data/processed/bell_curve_model.png")
     print("✅ Graph saved to data/processed/bell_curve_model.png")
-    plt.show()
+    if INTERACTIVE:
+        plt.show()
+    plt.close("all")
 
 
 if __name__ == "__main__":
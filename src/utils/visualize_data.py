@@ -1,7 +1,14 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 import os
 import sys
+import pandas as pd
+import matplotlib
+
+# Headless runs (CI, servers) have no window to open: use the Agg
+# backend there so importing pyplot never drags in a GUI toolkit.
+INTERACTIVE = bool(os.environ.get("DISPLAY")) and not os.environ.get("CI")
+if not INTERACTIVE:
+    matplotlib.use("Agg")
+import matplotlib.pyplot as plt
 
 """
 Traffic Data Analysis Module
@@ -44,22 +51,27 @@ def plot_traffic_flow():
 
     # 2. Load Data using Pandas
     # We parse the CSV into a DataFrame (df), which is like a programmable Excel sheet.
+    # Only the three plotted columns are read (the string timestamp column
+    # is skipped entirely), with explicit dtypes so pandas does no inference.
     try:
-        df = pd.read_csv(DATA_FILE)
+        df = pd.read_csv(
+            DATA_FILE,
+            usecols=["step", "vehicle_count", "avg_speed"],
+            dtype={"step": "int32", "vehicle_count": "int32", "avg_speed": "float32"},
+        )
     except Exception as e:
         print(f"❌ Error reading CSV: {e}")
         sys.exit(1)
 
     # 3. Setup the Canvas
-    # figsize=(14, 10) creates a large image (1400x1000 pixels approx)
-    plt.figure(figsize=(14, 10))
+    # figsize=(14, 10) creates a large image (1400x1000 pixels approx).
+    # sharex=True: both charts cover the same time axis, so ticks are
+    # computed once and only the bottom chart carries the x labels.
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
 
     # --- CHART 1: CONGESTION (Vehicle Count) ---
-    # subplot(2, 1, 1) means: 2 rows, 1 column, this is plot #1
-    plt.subplot(2, 1, 1)
-
     # Plot X (Time) vs Y (Count)
-    plt.plot(
+    ax1.plot(
         df["step"],
         df["vehicle_count"],
         label="Active Vehicles",
@@ -67,17 +79,16 @@ def plot_traffic_flow():
         linewidth=2,
     )
 
-    plt.title("Addis Ababa (Bole Corridor) - Traffic Congestion Analysis", fontsize=16)
-    plt.ylabel("Total Vehicles on Road", fontsize=12)
-    plt.grid(True, linestyle="--", alpha=0.6)  # Add a faint grid for readability
-    plt.legend(loc="upper left")
+    ax1.set_title(
+        "Addis Ababa (Bole Corridor) - Traffic Congestion Analysis", fontsize=16
+    )
+    ax1.set_ylabel("Total Vehicles on Road", fontsize=12)
+    ax1.grid(True, linestyle="--", alpha=0.6)  # Add a faint grid for readability
+    ax1.legend(loc="upper left")
 
     # --- CHART 2: FLOW QUALITY (Average Speed) ---
-    # subplot(2, 1, 2) means: 2 rows, 1 column, this is plot #2
-    plt.subplot(2, 1, 2)
-
     # Plot X (Time) vs Y (Speed)
-    plt.plot(
+    ax2.plot(
         df["step"],
         df["avg_speed"],
         label="Avg Network Speed (m/s)",
@@ -85,27 +96,30 @@ def plot_traffic_flow():
         linewidth=2,
     )
 
-    plt.xlabel("Simulation Duration (Seconds)", fontsize=14)
-    plt.ylabel("Average Speed (m/s)", fontsize=12)
+    ax2.set_xlabel("Simulation Duration (Seconds)", fontsize=14)
+    ax2.set_ylabel("Average Speed (m/s)", fontsize=12)
 
     # Add a "Critical Speed" line (Traffic Jam Threshold)
     # If speed drops below 5 m/s (~18 km/h), it's a jam.
-    plt.axhline(y=5, color="red", linestyle=":", label="Congestion Threshold (5 m/s)")
+    ax2.axhline(y=5, color="red", linestyle=":", label="Congestion Threshold (5 m/s)")
 
-    plt.grid(True, linestyle="--", alpha=0.6)
-    plt.legend(loc="upper right")
+    ax2.grid(True, linestyle="--", alpha=0.6)
+    ax2.legend(loc="upper right")
 
     # 4. Save and Show
     # Ensure the output directory exists
     os.makedirs(os.path.dirname(OUTPUT_IMG), exist_ok=True)
 
-    plt.tight_layout()  # Adjusts margins so titles don't get cut off
-    plt.savefig(OUTPUT_IMG)
+    fig.tight_layout()  # Adjusts margins so titles don't get cut off
+    fig.savefig(OUTPUT_IMG, dpi=100)
     print(f"✅ Analysis Graph saved to: {OUTPUT_IMG}")
 
-    # Show the interactive window
-    print("🖥️  Opening visualization window...")
-    plt.show()
+    # Show the interactive window (skipped on headless runs so batch
+    # pipelines never block on a window that can't open)
+    if INTERACTIVE:
+        print("🖥️  Opening visualization window...")
+        plt.show()
+    plt.close("all")  # free the canvas buffers
 
 
 if __name__ == "__main__":